@@ -11,6 +11,12 @@ import asyncio
 import sys
 
 from src.stream_notification import StreamNotification
+from src.utils import configure_logging
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None  # type: ignore
 
 
 async def run_stream_notification() -> None:
@@ -28,4 +34,8 @@ async def run_stream_notification() -> None:
     await app.terminal.close_terminal()
 
 if __name__ == "__main__":
-    sys.exit(asyncio.run(run_stream_notification()))
+    configure_logging()
+    # uvloopが利用できる場合はサブプロセスやソケットの処理が速いuvloopのイベントループを使う
+    loop_factory = uvloop.new_event_loop if uvloop else None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        sys.exit(runner.run(run_stream_notification()))
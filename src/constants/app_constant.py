@@ -15,9 +15,27 @@ class AppConstant(StrictConstant):
 
     Attributes:
         CHECK_INTERVAL (int): Normal check interval (seconds).
+        MAX_CHECK_INTERVAL (int): Upper limit of the check interval while the streamer stays offline (seconds).
         STREAMING_INTERVAL (int): Check interval when streaming (seconds).
+        STREAM_CACHE_TTL (float): How long a fetched stream status is shared between callers (seconds).
+        RATELIMIT_LOW_RATIO (float): Ratio of remaining rate limit points below which polling slows down.
+        RATELIMIT_MAX_BACKOFF (int): Maximum extra wait added when the rate limit runs low (seconds).
+        SERVER_ERROR_RETRIES (int): Number of retries of a request answered with a server error.
+        RETRY_MAX_BACKOFF (int): Maximum wait before retrying a request answered with a server error (seconds).
+        STREAMS_PER_REQUEST (int): Maximum number of users whose streams are fetched in one request.
+        BROADCASTER_CACHE_TTL (int): How long looked-up broadcasters are reused (seconds).
+        BROADCASTER_CACHE_SIZE (int): Maximum number of broadcasters kept in the cache.
         TIMEOUT_SECONDS (int): Timeout seconds for requests.
+        CONNECT_TIMEOUT_SECONDS (int): Timeout seconds for opening a connection.
+        DOWNLOAD_CHUNK_SIZE (int): Size of each chunk written while downloading the profile image (bytes).
         GRANT_TYPE (str): Grant type for the Twitch API.
+        TOKEN_REFRESH_MARGIN (int): How long before its expiry the access token is refreshed (seconds).
+        CONNECTION_LIMIT (int): Maximum number of simultaneous connections of the HTTP client.
+        CONNECTION_LIMIT_PER_HOST (int): Maximum number of simultaneous connections to one host.
+        KEEPALIVE_TIMEOUT (int): How long an idle connection is kept open for reuse between normal checks (seconds).
+        DNS_CACHE_TTL (int): How long resolved host names are cached (seconds).
+        SESSION_CLOSE_TIMEOUT (int): Maximum wait for the HTTP client to close (seconds).
+        OSASCRIPT_SCRIPT_TIMEOUT (int): Maximum wait for the osascript worker to finish a script (seconds).
         ERROR_SESSION_NOT_INITIALIZED (str): Error message for uninitialized session.
         ERROR_ACCESS_TOKEN_NOT_AVAILABLE (str): Error message for unavailable access token.
         ERROR_ACCESS_TOKEN_FAILED (str): Error message for failed access token retrieval.
@@ -25,14 +43,37 @@ class AppConstant(StrictConstant):
         STYLE (dict): Style settings for the interactive interface.
         CUSTOM_STYLE (InquirerPyStyle): Custom style for the interactive interface.
         LOG_FORMAT (str): Log format.
+        LOG_DATE_FORMAT (str): Date format of the log records.
         LOG_FILE (str): Log file name.
     """
     # Twitch API関連
     CHECK_INTERVAL: int = 60  # 通常の確認間隔（秒）
+    MAX_CHECK_INTERVAL: int = 300  # オフラインが続く時の確認間隔の上限（秒）
     STREAMING_INTERVAL: int = 3600  # 配信中の確認間隔（秒）
+    STREAM_CACHE_TTL: float = 2.5  # 配信状態を使い回す期間（秒）
+    RATELIMIT_LOW_RATIO: float = 0.1  # 確認間隔を延ばし始めるレート制限の残量の割合
+    RATELIMIT_MAX_BACKOFF: int = 60  # レート制限の残量がない時に追加する待機時間（秒）
+    SERVER_ERROR_RETRIES: int = 3  # サーバーエラー時の再試行回数
+    RETRY_MAX_BACKOFF: int = 30  # サーバーエラー時の再試行までの最大待機時間（秒）
+    STREAMS_PER_REQUEST: int = 100  # 一度のリクエストで配信状況を取得できるユーザー数の上限
+    BROADCASTER_CACHE_TTL: int = 3600  # 配信者情報を使い回す期間（秒）
+    BROADCASTER_CACHE_SIZE: int = 1024  # キャッシュする配信者情報の最大数
 
     TIMEOUT_SECONDS: int = 10
+    CONNECT_TIMEOUT_SECONDS: int = 2
+    DOWNLOAD_CHUNK_SIZE: int = 64 * 1024  # プロフィール画像を書き込む単位（バイト）
     GRANT_TYPE: str = "client_credentials"
+    TOKEN_REFRESH_MARGIN: int = 60  # アクセストークンの有効期限の何秒前に取得し直すか
+
+    # HTTPクライアントの接続設定
+    CONNECTION_LIMIT: int = 8
+    CONNECTION_LIMIT_PER_HOST: int = 4
+    KEEPALIVE_TIMEOUT: int = 75  # 通常の確認間隔（60秒）の間だけ接続を使い回す。間隔が延びた後は接続し直す
+    DNS_CACHE_TTL: int = 300
+    SESSION_CLOSE_TIMEOUT: int = 5
+
+    # osascript関連
+    OSASCRIPT_SCRIPT_TIMEOUT: int = 90  # ダイアログが自動で閉じる時間（最長60秒）より長くする
 
     # エラーメッセージの定義
     ERROR_SESSION_NOT_INITIALIZED: str = "Session not initialized"
@@ -55,4 +96,5 @@ class AppConstant(StrictConstant):
 
     # ロガーの設定
     LOG_FORMAT = "%(asctime)s - %(message)s"
+    LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
     LOG_FILE = "notification.log"
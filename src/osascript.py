@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+
+"""
+osascript.py
+This module provides helpers for running osascript, and a long-lived osascript process
+that runs AppleScripts sent over its stdin.
+"""
+
+import asyncio
+import os
+import subprocess
+
+from src.constants import AppConstant
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+_OSASCRIPT = "/usr/bin/osascript"
+_ACK = "stream-notification-ack"
+
+
+def _quote(value: str) -> str:
+    """Quote a value as a single-line AppleScript string literal.
+
+    Args:
+        value (str): The value to quote.
+
+    Returns:
+        str: The AppleScript string literal.
+    """
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r")
+    return f'"{escaped}"'
+
+
+async def run_osascript(*args: str | bytes | os.PathLike[str]) -> None:
+    """Run osascript and wait until it exits. The output is discarded.
+
+    If the wait is cancelled, osascript is terminated.
+
+    Args:
+        *args (str | bytes | os.PathLike[str]): The script path and the arguments passed to the script.
+
+    Raises:
+        OSError: If osascript could not be started.
+        SubprocessError: If an error occurs while starting osascript.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        _OSASCRIPT,
+        *args,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    try:
+        await proc.wait()
+    except asyncio.CancelledError:
+        # キャンセルされた場合はosascriptを残さずに終了させる
+        if proc.returncode is None:
+            proc.terminate()
+        raise
+
+
+def spawn_osascript(*args: bytes) -> None:
+    """Start osascript in a new session without waiting for it to finish.
+
+    Args:
+        *args (bytes): The encoded script path and the arguments passed to the script.
+
+    Raises:
+        OSError: If osascript could not be started.
+        SubprocessError: If an error occurs while starting osascript.
+    """
+    subprocess.Popen(
+        [_OSASCRIPT, *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def compiled_script_path(source_path: str) -> str | None:
+    """Get the path of the compiled form of an AppleScript if it is up to date.
+
+    Args:
+        source_path (str): The path of the .applescript file.
+
+    Returns:
+        str | None: The path of the .scpt file, or None if it is missing or older than the source.
+    """
+    compiled_path = os.path.splitext(source_path)[0] + ".scpt"
+    try:
+        if os.path.getmtime(compiled_path) >= os.path.getmtime(source_path):
+            return compiled_path
+    except OSError:
+        pass
+    return None
+
+
+async def compile_script(source_path: str) -> str | None:
+    """Compile an AppleScript into a .scpt file next to it.
+
+    osascript has to parse and compile a plain .applescript file every time it runs it,
+    so the compiled form is cached next to the source and reused until the source changes.
+
+    Args:
+        source_path (str): The path of the .applescript file.
+
+    Returns:
+        str | None: The path of the .scpt file, or None if the script could not be compiled.
+    """
+    compiled_path = compiled_script_path(source_path)
+    if compiled_path:
+        return compiled_path
+
+    compiled_path = os.path.splitext(source_path)[0] + ".scpt"
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "/usr/bin/osacompile",
+            "-o",
+            compiled_path,
+            source_path,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        await proc.wait()
+    except (OSError, subprocess.SubprocessError):
+        logger.exception("Failed to compile %s", source_path)
+        return None
+    return compiled_path if proc.returncode == 0 else None
+
+
+class OsascriptWorker(object):
+    """Class for running AppleScripts in a single interactive osascript process.
+
+    Spawning osascript for every notification pays fork/exec and interpreter startup each time.
+    The worker keeps one `osascript -i` process alive and asks it to `run script` each file.
+
+    Attributes:
+        _proc (asyncio.subprocess.Process | None): The interactive osascript process.
+        _lock (asyncio.Lock): A lock for sending one script at a time.
+        _killed (list[asyncio.subprocess.Process]): The processes killed after a timeout, reaped by close().
+    """
+
+    def __init__(self) -> None:
+        """Initialize the worker."""
+        self._proc: asyncio.subprocess.Process | None = None
+        self._lock = asyncio.Lock()
+        self._killed: list[asyncio.subprocess.Process] = []
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the osascript process is running."""
+        return self._proc is not None and self._proc.returncode is None
+
+    async def start(self) -> None:
+        """Start the interactive osascript process.
+
+        Raises:
+            FileNotFoundError: If osascript is not found.
+            SubprocessError: If an error occurs while starting osascript.
+        """
+        if self.is_alive:
+            return
+
+        try:
+            self._proc = await asyncio.create_subprocess_exec(
+                _OSASCRIPT,
+                "-i",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except (OSError, subprocess.SubprocessError):
+            logger.exception("Failed to start the osascript worker.")
+            self._proc = None
+
+    async def run_script(self, script_path: str, *args: str) -> bool:
+        """Run an AppleScript file in the worker and wait until it finishes.
+
+        If the script does not finish within OSASCRIPT_SCRIPT_TIMEOUT or the wait is cancelled,
+        the worker is killed so that later scripts are run in new osascript processes.
+
+        Args:
+            script_path (str): The path of the AppleScript.
+            *args (str): The arguments passed to the `on run` handler of the script.
+
+        Returns:
+            bool: True if the worker ran the script, False if the worker is not available.
+        """
+        async with self._lock:
+            if not self.is_alive or not self._proc or not self._proc.stdin or not self._proc.stdout:
+                return False
+
+            parameters = ", ".join(_quote(arg) for arg in args)
+            command = (
+                f"run script (POSIX file {_quote(script_path)}) with parameters {{{parameters}}}\n"
+                f"{_quote(_ACK)}\n"
+            )
+            try:
+                self._proc.stdin.write(command.encode())
+                await self._proc.stdin.drain()
+                # スクリプトの完了後に評価される応答行を待つ
+                async with asyncio.timeout(AppConstant.OSASCRIPT_SCRIPT_TIMEOUT):
+                    while line := await self._proc.stdout.readline():
+                        if _ACK.encode() in line:
+                            return True
+            except (BrokenPipeError, ConnectionResetError):
+                logger.warning("osascript worker stopped.")
+            except TimeoutError:
+                logger.warning("osascript worker did not respond. Stopping the worker.")
+                self._kill()
+            except asyncio.CancelledError:
+                # 応答行を読み残したままでは次のスクリプトの応答と区別できないため、ワーカーを止める
+                self._kill()
+                raise
+            return False
+
+    def _kill(self) -> None:
+        """Kill the interactive osascript process without waiting for it.
+
+        The killed process is reaped by close().
+        """
+        proc, self._proc = self._proc, None
+        if proc and proc.returncode is None:
+            proc.kill()
+            self._killed.append(proc)
+
+    async def close(self) -> None:
+        """Stop the interactive osascript process and reap the processes killed after a timeout."""
+        killed, self._killed = self._killed, []
+        for killed_proc in killed:
+            await killed_proc.wait()
+
+        if not self._proc:
+            return
+
+        proc, self._proc = self._proc, None
+        if proc.returncode is not None:
+            return
+        if proc.stdin:
+            proc.stdin.close()
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=AppConstant.TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
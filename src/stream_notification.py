@@ -14,34 +14,40 @@ import signal
 import subprocess
 import sys
 import termios
-import traceback
+import time
 import tty
-from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import AsyncIterator
+from typing import Any, Coroutine, Self
 
-import urllib3.util
 from aiohttp import ClientError
 from InquirerPy import inquirer
 from InquirerPy.utils import color_print
 
 from src.constants import AppConstant
 from src.enums import NotificationFormat
+from src.osascript import OsascriptWorker, compile_script, spawn_osascript
 from src.terminal import Terminal
 from src.twitch import TwitchAPI, TwitchAPITimeoutError
-from src.utils import FormatValidator, UsernameValidator, get_base_path, get_logger
+from src.utils import IS_COMPILED, UsernameValidator, get_base_path, get_logger
 
 logger = get_logger(__name__)
 
-def _write_content(filepath: Path, data: bytes) -> None:
-    """Helper function to handle blocking file writes."""
-    with open(filepath, "wb") as f:
-        f.write(data)
+_SHUTDOWN_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+_FORMAT_CHOICES = [fmt.value for fmt in NotificationFormat]
 
 def _get_filename_from_url(url: str) -> str:
     """Extract the filename from given URL."""
     return os.path.basename(url)
 
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Write all of data to a file descriptor, continuing after short writes."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
 class StreamNotification(object):
     """StreamNotification
 
@@ -53,31 +59,168 @@ class StreamNotification(object):
         is_running (bool): The running status of the application
         _cleanup_tasks (list[asyncio.Task]): The cleanup tasks
         cleanup_compelete_event (asyncio.Event): The cleanup complete event
+        _scripts (dict[str, str]): The AppleScripts to run keyed by script name
+        _script_argv (dict[str, bytes]): The encoded paths of _scripts passed to osascript
+        _resources_dir (str): The directory holding the downloaded profile image
+        _osa_worker (OsascriptWorker): The long-lived osascript process running the notification scripts
+        _stream_cache (dict[str, tuple[float, tuple[str | None, str | None, str | None]]]):
+            The recent stream data by username
+        _shutdown_event (asyncio.Event): The event set when the application should shut down
+        _cleanup_lock (asyncio.Lock): A lock for running cleanup only once
+        _cleanup_done (bool): Whether cleanup has finished
+        _last_stream_id (str | None): The ID of the stream already notified, None while offline
+        _username_cf (str | None): The casefolded username of the monitored streamer
+        _offline_interval (float): The next check interval while the streamer is offline
+        downloaded_profile_image_name (str | None): The file name of the downloaded profile image
+        _profile_image_task (asyncio.Task | None): The task downloading the profile image
     """
 
+    # インスタンスごとの__dict__を持たせず、属性アクセスを速くする
+    __slots__ = (
+        "base_dir",
+        "twitch_api",
+        "_cleanup_tasks",
+        "cleanup_complete_event",
+        "terminal",
+        "_scripts",
+        "_script_argv",
+        "_resources_dir",
+        "_osa_worker",
+        "_stream_cache",
+        "_shutdown_event",
+        "_cleanup_lock",
+        "_cleanup_done",
+        "_last_stream_id",
+        "_username_cf",
+        "_offline_interval",
+        "downloaded_profile_image_name",
+        "_profile_image_task",
+    )
+
     def __init__(self):
         """Initialize instancee of StreamNotification
+
+        Raises:
+            FileNotFoundError: An AppleScript was not found
         """
         self.base_dir = get_base_path()
         self.twitch_api = TwitchAPI()
-        self.is_running = True
         self._cleanup_tasks: list[asyncio.Task] = []
         self.cleanup_complete_event = asyncio.Event()
         self.terminal = Terminal(self.base_dir)
+        self._scripts: dict[str, str] = {}
+        self._script_argv: dict[str, bytes] = {}
+        script_dir = os.path.join(str(self.base_dir), "applescript")
+        for name in ("notification", "dialog", "starting_dialog"):
+            script_path = os.path.join(script_dir, f"{name}.applescript")
+            if not os.path.exists(script_path):
+                raise FileNotFoundError(script_path)
+            self._set_script(name, script_path)
+        self._resources_dir = os.path.join(str(self.base_dir.parent), "Resources")
+        self._osa_worker = OsascriptWorker()
+        self._stream_cache: dict[str, tuple[float, tuple[str | None, str | None, str | None]]] = {}
+        self._shutdown_event = asyncio.Event()
+        self._cleanup_lock = asyncio.Lock()
+        self._cleanup_done = False
+        self._last_stream_id: str | None = None
+        self._username_cf: str | None = None
+        self._offline_interval: float = AppConstant.CHECK_INTERVAL
+        self.downloaded_profile_image_name: str | None = None
+        self._profile_image_task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> Self:
+        """Initialize the application
 
-    @asynccontextmanager
-    async def initialize(self) -> AsyncIterator["StreamNotification"]:
-        """Application initialization context manager
-
-        Yields:
+        Returns:
             StreamNotification: The StreamNotification instance
         """
+        # シグナルはイベントループ内で受け取り、run()に終了を要求する
+        loop = asyncio.get_running_loop()
+        for sig in _SHUTDOWN_SIGNALS:
+            loop.add_signal_handler(sig, self._handle_shutdown_signal)
+
         await self.twitch_api.initialize()
-        yield self
+        await self._compile_scripts()
+        await self._osa_worker.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Clean up the application when leaving the context"""
+        await self.cleanup()
+
+    @property
+    def is_running(self) -> bool:
+        """The running status of the application, False once shutdown has been requested"""
+        return not self._shutdown_event.is_set()
+
+    async def _wait_for_shutdown(self, delay: float) -> None:
+        """Wait until the delay elapses or shutdown is requested, whichever comes first
+
+        Args:
+            delay (float): The maximum number of seconds to wait
+        """
+        # 終了要求があれば確認間隔の経過を待たずに戻る
+        with contextlib.suppress(TimeoutError):
+            async with asyncio.timeout(delay):
+                await self._shutdown_event.wait()
+
+    def _handle_shutdown_signal(self) -> None:
+        """Request shutdown when SIGINT or SIGTERM is received
+
+        run() waits for the shutdown event and cleans up the application.
+        """
+        self._shutdown_event.set()
+
+    async def _compile_scripts(self) -> None:
+        """Compile the notification and terminal AppleScripts into .scpt files
+
+        The compiled scripts are used instead of the sources from the next run onward.
+        """
+        for name, source_path in list(self._scripts.items()):
+            compiled_path = await compile_script(source_path)
+            if compiled_path:
+                self._set_script(name, compiled_path)
+        await self.terminal.compile_scripts()
+
+    def _set_script(self, name: str, script_path: str) -> None:
+        """Set the AppleScript to run for a name
+
+        The path is encoded once here so that spawning osascript does not convert it on every call.
+
+        Args:
+            name (str): The name of the script
+            script_path (str): The path of the script
+        """
+        self._scripts[name] = script_path
+        self._script_argv[name] = os.fsencode(script_path)
+
+    def _run_in_background(self, coro: Coroutine[Any, Any, None]) -> asyncio.Task:
+        """Run a coroutine without waiting for it
+
+        The task is tracked in _cleanup_tasks until it finishes so that cleanup can cancel it.
+
+        Args:
+            coro (Coroutine[Any, Any, None]): The coroutine to run
+
+        Returns:
+            asyncio.Task: The task running the coroutine
+        """
+        task = asyncio.create_task(coro)
+        self._cleanup_tasks.append(task)
+        task.add_done_callback(self._cleanup_tasks.remove)
+        return task
+
+    async def _wait_for_profile_image(self) -> None:
+        """Wait until the profile image download started by check_streamer_existence finishes"""
+        if self._profile_image_task:
+            await self._profile_image_task
 
     async def display_message(self, message: str) -> None:
-        """Display a message to the user"""
-        print(message)
+        """Display a message to the user
+
+        The output is flushed right away because stdout may not be line-buffered while the terminal is in raw mode.
+        """
+        print(message, flush=True)
 
     def display_colored_found_message(self, username: str, message: str) -> None:
         """Display a message to the user
@@ -96,13 +239,20 @@ class StreamNotification(object):
             ("#ffffff", suffix)
         ])
 
-    def format_display_message(self, username: str, display_name: str, stream_title: str) -> str:
+    def format_display_message(
+        self,
+        username: str,
+        display_name: str,
+        stream_title: str,
+        username_cf: str | None = None
+    ) -> str:
         """Formats the message to be displayed
 
         Args:
             username (str): The username of the streamer
             display_name (str): The display name of the streamer
             stream_title (str): The title of the stream
+            username_cf (str | None): The casefolded username, computed from username if omitted
 
         Returns:
             str: The formatted message
@@ -112,144 +262,161 @@ class StreamNotification(object):
             "display_name has started streaming: stream_title"
         """
         base_format = f" has started streaming: {stream_title}"
-        if username.lower() == display_name.lower():
+        if (username_cf or username.casefold()) == display_name.casefold():
             return display_name + base_format
         return f"{display_name}({username})" + base_format
 
-    async def _run_notification_script(self, message: str, title: str) -> None:
-        """Run the notification AppleScript to display a notification
+    def _profile_image_path(self) -> str:
+        """Get the path of the downloaded profile image used as the dialog icon
+
+        Returns:
+            str: The full path to the profile image
+        """
+        filename = self.downloaded_profile_image_name or "profile_image.png"
+        return os.path.join(self._resources_dir, filename)
+
+    async def _run_script(self, name: str, *args: str) -> None:
+        """Run a notification AppleScript
+
+        The script is sent to the osascript worker, and runs in a new osascript process if the worker is unavailable.
+        The new process is not waited for.
 
         Args:
-            message (str): The message to display
-            title (str): The title of the notification
+            name (str): The name of the script ("notification", "dialog" or "starting_dialog")
+            *args (str): The arguments passed to the script
 
         Raises:
             subprocess.SubprocessError: An error occurred while running the script
-            FileNotFoundError: The script was not found
         """
-        try:
-            script_path = Path(self.base_dir, "applescript", "notification.applescript")
-        except FileNotFoundError:
-            logger.exception(traceback.format_exc())
+        if await self._osa_worker.run_script(self._scripts[name], *args):
             return
 
-        script_arguments = [message, title]
-
         try:
-            proc = await asyncio.create_subprocess_exec(
-                "/usr/bin/osascript",
-                script_path,
-                *script_arguments,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            await proc.communicate()
-        except subprocess.SubprocessError:
-            logger.exception(traceback.format_exc())
+            # 結果を待たないため、子プロセスの監視を伴わないPopenで起動する
+            # 引数をバイト列で渡し、subprocess内での変換を省く
+            argv = [arg.encode() for arg in args]
+            await asyncio.to_thread(spawn_osascript, self._script_argv[name], *argv)
+        except (OSError, subprocess.SubprocessError):
+            logger.exception("Failed to run %s", self._scripts[name])
             return
 
-
-    async def _run_dialog_script(self, message: str, title: str, a_url: urllib3.util.Url) -> None:
-        """Run to display a dialogue Applescript informing that the monitored object has started a stream
+    async def _get_stream(self, username: str) -> tuple[str | None, str | None, str | None]:
+        """Get the stream data of a streamer, sharing recent lookups
 
         Args:
-            message (str): The message to display
-            title (str): The title of the dialog
-            a_url (urllib3.util.Url): The URL to open
+            username (str): The username of the streamer
 
-        Raises:
-            subprocess.SubprocessError: An error occurred while running the script
-            FileNotFoundError: The script was not found
+        Returns:
+            tuple[str | None, str | None, str | None]:
+                The display name, the stream title and the stream ID if streaming, None otherwise
         """
-        try:
-            script_path = Path(self.base_dir, "applescript", "dialog.applescript")
-        except FileNotFoundError:
-            logger.exception(traceback.format_exc())
-            return
+        key = username.lower()
+        cached = self._stream_cache.get(key)
+        if cached and time.monotonic() - cached[0] < AppConstant.STREAM_CACHE_TTL:
+            return cached[1]
+
+        stream = await self.twitch_api.get_stream_by_name(username)
+        self._stream_cache[key] = (time.monotonic(), stream)
+        return stream
+
+    async def _notify_stream_started(
+        self,
+        username: str,
+        display_name: str,
+        stream_title: str,
+        display_format: NotificationFormat
+    ) -> None:
+        """Notify the user that the streamer has started streaming
 
-        filename = getattr(self, "downloaded_profile_image_name", None) or "profile_image.png"
-        icon_full_path = os.path.join(
-            self.base_dir.parent.as_posix(),
-            "Resources",
-            filename
-        )
-        script_arguments = [message, title, a_url.url, icon_full_path]
+        Args:
+            username (str): The username of the streamer
+            display_name (str): The display name of the streamer
+            stream_title (str): The title of the stream
+            display_format (NotificationFormat): The display format to use
+        """
+        url_string = f"https://www.twitch.tv/{username}"
+        message = self.format_display_message(username, display_name, stream_title, self._username_cf)
+        notification_title = "Stream Started"
+        if display_format is NotificationFormat.NOTIFICATION:
+            await self._run_script("notification", message, notification_title)
+        else:
+            await self._wait_for_profile_image()
+            await self._run_script("dialog", message, notification_title, url_string, self._profile_image_path())
 
-        try:
-            proc = await asyncio.create_subprocess_exec(
-                "/usr/bin/osascript",
-                script_path,
-                *script_arguments,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            await proc.communicate()
-        except subprocess.SubprocessError:
-            logger.exception(traceback.format_exc())
-            return
+    def _rate_limited_interval(self, interval: float) -> float:
+        """Stretch a check interval according to the rate limit reported by Twitch
 
-    async def _run_starting_dialog_script(self, message: str, title: str, icon_full_path: str) -> None:
-        """Run to display dialog Applescript to start monitoring
+        The wait grows linearly up to RATELIMIT_MAX_BACKOFF seconds as the remaining points fall
+        below RATELIMIT_LOW_RATIO of the bucket, and lasts until the reset time once the bucket is empty.
 
         Args:
-            message (str): The message to display
-            title (str): The title of the dialog
-            icon_full_path (str): The full path to the icon
+            interval (float): The regular check interval in seconds
 
-        Raises:
-            subprocess.SubprocessError: An error occurred while running the script
-            FileNotFoundError: The script was not found
+        Returns:
+            float: The number of seconds to wait before the next check
         """
-        try:
-            script_path = Path(self.base_dir, "applescript", "starting_dialog.applescript")
-        except FileNotFoundError:
-            logger.exception(traceback.format_exc())
-            return
+        remaining = self.twitch_api.ratelimit_remaining
+        limit = self.twitch_api.ratelimit_limit
+        if remaining is None or not limit:
+            return interval
 
-        script_arguments = [message, title, icon_full_path]
+        reset = self.twitch_api.ratelimit_reset
+        if remaining <= 0 and reset is not None:
+            return max(interval, reset - time.time())
 
-        try:
-            proc = await asyncio.create_subprocess_exec(
-                "/usr/bin/osascript",
-                script_path,
-                *script_arguments,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            await proc.communicate()
-        except subprocess.SubprocessError:
-            logger.exception(traceback.format_exc())
-            return
+        ratio = remaining / limit
+        if ratio > AppConstant.RATELIMIT_LOW_RATIO:
+            return interval
+        backoff = (AppConstant.RATELIMIT_LOW_RATIO - ratio) / AppConstant.RATELIMIT_LOW_RATIO
+        return interval + backoff * AppConstant.RATELIMIT_MAX_BACKOFF
+
+    async def _poll_stream_status(self, username: str, display_format: NotificationFormat) -> float:
+        """Fetch the streaming status once and notify the user if the streamer is live
+
+        A stream that has already been notified is not notified again.
+        While the streamer stays offline, the interval doubles up to MAX_CHECK_INTERVAL.
+
+        Args:
+            username (str): The username of the streamer
+            display_format (NotificationFormat): The display format to use
+
+        Returns:
+            float: The number of seconds to wait before the next check
+        """
+        display_name, stream_title, stream_id = await self._get_stream(username)
+        if display_name and stream_title:
+            if stream_id is None or stream_id != self._last_stream_id:
+                self._last_stream_id = stream_id
+                self._run_in_background(
+                    self._notify_stream_started(username, display_name, stream_title, display_format)
+                )
+            self._offline_interval = AppConstant.CHECK_INTERVAL
+            return self._rate_limited_interval(AppConstant.STREAMING_INTERVAL)
+        # 配信が終了したら次の配信を通知できるようにする
+        self._last_stream_id = None
+        interval = self._offline_interval
+        self._offline_interval = min(interval * 2, AppConstant.MAX_CHECK_INTERVAL)
+        return self._rate_limited_interval(interval)
 
     async def check_stream_status(self, username: str, display_format: NotificationFormat) -> None:
         """Check the streaming status of a streamer
 
         Args:
             username (str): The username of the streamer
-            display_format (str): The display format to use
+            display_format (NotificationFormat): The display format to use
 
         Raises:
             TwitchAPITimeoutError: If the Twitch API request times out
         """
+        # 監視中はユーザー名が変わらないため、比較用の値を一度だけ求める
+        self._username_cf = username.casefold()
         while self.is_running:
             try:
-                display_name, stream_title = await self.twitch_api.get_stream_by_name(username)
-
-                if display_name and stream_title:
-                    url_string = f"https://www.twitch.tv/{username}"
-                    a_url: urllib3.util.Url = urllib3.util.parse_url(url_string)
-                    message = self.format_display_message(username, display_name, stream_title)
-                    notification_title = "Stream Started"
-                    if display_format == NotificationFormat.NOTIFICATION:
-                        await self._run_notification_script(message, notification_title)
-                    else:
-                        await self._run_dialog_script(message, notification_title, a_url)
-                    await asyncio.sleep(AppConstant.STREAMING_INTERVAL)
-                else:
-                    await asyncio.sleep(AppConstant.CHECK_INTERVAL)
+                interval = await self._poll_stream_status(username, display_format)
+                await self._wait_for_shutdown(interval)
             except TwitchAPITimeoutError:
                 print("\nConnection to Twitch API timed out. Terminating application...")
-                await self.cleanup()
+                self._shutdown_event.set()
                 break
 
     async def download_profile_image(self, image_url: str | None, save_path: Path) -> None:
@@ -262,26 +429,39 @@ class StreamNotification(object):
         if not image_url or not self.twitch_api.session:
             return
 
+        # 応答を確認してからファイルを開き、画像全体をメモリに保持せずに受信したチャンクをそのまま書き込む
+        fd: int | None = None
         try:
             async with self.twitch_api.session.get(image_url) as response:
                 response.raise_for_status()
-                content = await response.read()
-            await asyncio.to_thread(_write_content, save_path, content)
-        except ClientError:
+                fd = await asyncio.to_thread(os.open, save_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                async for chunk in response.content.iter_chunked(AppConstant.DOWNLOAD_CHUNK_SIZE):
+                    _write_all(fd, chunk)
+        except (ClientError, OSError):
             logger.exception("Failed to download profile image.")
+            if fd is not None:
+                # 書きかけの画像がダイアログのアイコンに使われないように削除する
+                with contextlib.suppress(OSError):
+                    os.unlink(save_path)
+        finally:
+            if fd is not None:
+                os.close(fd)
 
     async def check_streamer_existence(self, username: str, display_format: NotificationFormat) -> bool:
         """Check if the streamer exists
 
         Args:
             username (str): The username of the streamer
-            display_format (str): The display format to use
+            display_format (NotificationFormat): The display format to use
 
         Returns:
             bool: True if the streamer exists, False otherwise
         """
-        resources_dir = Path(os.path.join(self.base_dir.parent.as_posix(), "Resources"))
-        broadcaster = await self.twitch_api.get_broadcaster(username)
+        # 配信状況の取得を並行して始め、最初の確認ではキャッシュされた結果を使う
+        broadcaster, _ = await asyncio.gather(
+            self.twitch_api.get_broadcaster(username),
+            self._get_stream(username)
+        )
         if not broadcaster:
             self.display_colored_found_message(username, "not found.")
             return False
@@ -291,7 +471,10 @@ class StreamNotification(object):
 
         if image_url:
             image_filename = _get_filename_from_url(image_url)
-            await self.download_profile_image(image_url, resources_dir / image_filename)
+            # ダイアログで使うまで待たずに、画像のダウンロードを並行して進める
+            self._profile_image_task = self._run_in_background(
+                self.download_profile_image(image_url, Path(self._resources_dir, image_filename))
+            )
 
         image_filename = image_filename or "profile_image.png"
         self.downloaded_profile_image_name = image_filename
@@ -299,16 +482,26 @@ class StreamNotification(object):
         found_msg = f"Found {username}. You will be notified when the streaming starts."
         self.display_colored_found_message(username, found_msg)
         found_title = "Streamer Found"
-        if display_format == NotificationFormat.NOTIFICATION:
-            await self._run_notification_script(found_msg, found_title)
+        # 通知の表示を待たずに最初の配信状況の確認と並行して実行する
+        if display_format is NotificationFormat.NOTIFICATION:
+            self._run_in_background(self._run_script("notification", found_msg, found_title))
         else:
-            icon_path = os.path.join(resources_dir.as_posix(), image_filename)
-            await self._run_starting_dialog_script(found_msg, found_title, icon_path)
+            self._run_in_background(self._show_starting_dialog(found_msg, found_title))
 
         how_to_quit = "Type [q] to quit the application."
         await self.display_message(how_to_quit)
         return True
 
+    async def _show_starting_dialog(self, message: str, title: str) -> None:
+        """Show the starting dialog once the profile image used as its icon has been downloaded
+
+        Args:
+            message (str): The message to display
+            title (str): The title of the dialog
+        """
+        await self._wait_for_profile_image()
+        await self._run_script("starting_dialog", message, title, self._profile_image_path())
+
     async def cleanup(self) -> None:
         """Clean up the application
 
@@ -318,36 +511,44 @@ class StreamNotification(object):
             asyncio.CancelledError: The task was cancelled
             OSError: An error occurred while removing the downloaded profile image
         """
+        loop = asyncio.get_running_loop()
+        for sig in _SHUTDOWN_SIGNALS:
+            loop.remove_signal_handler(sig)
         signal.signal(signal.SIGINT, signal.SIG_IGN)
 
-        if not self.is_running:
-            return
-        self.is_running = False
+        # 複数の経路から呼ばれても一度だけ実行し、後続の呼び出しは完了を待つ
+        async with self._cleanup_lock:
+            if self._cleanup_done:
+                return
+            self._shutdown_event.set()
 
-        for task in self._cleanup_tasks:
-            if not task.done():
+            # 全てのタスクを先にキャンセルしてからまとめて終了を待つ
+            current_task = asyncio.current_task()
+            pending_tasks = [task for task in self._cleanup_tasks if task is not current_task and not task.done()]
+            for task in pending_tasks:
                 task.cancel()
-                with contextlib.suppress(asyncio.CancelledError):
-                    await task
+            await asyncio.gather(*pending_tasks, return_exceptions=True)
 
-        await self.twitch_api.close()
+            await self.twitch_api.close()
+            await TwitchAPI.shutdown()
+            await self._osa_worker.close()
 
-        try:
-            if hasattr(self, "downloaded_profile_image_name"):
-                filename = self.downloaded_profile_image_name or "profile_image.png"
-                resources_path = Path(self.base_dir.parent.as_posix(), "Resources", filename)
-                if resources_path.exists():
-                    resources_path.unlink()
-        except OSError:
-            logger.warning("Failed to remove downloaded profile image.")
+            try:
+                if self.downloaded_profile_image_name is not None:
+                    resources_path = Path(self._resources_dir, self.downloaded_profile_image_name)
+                    if resources_path.exists():
+                        resources_path.unlink()
+            except OSError:
+                logger.warning("Failed to remove downloaded profile image.")
 
-        self.cleanup_complete_event.set()
+            self._cleanup_done = True
+            self.cleanup_complete_event.set()
 
     async def input_monitoring_settings(self) -> tuple[str, "NotificationFormat"]:
         """Prompt the user for monitoring settings
 
         Returns:
-            tuple[str, str]: The username and display format
+            tuple[str, NotificationFormat]: The username and display format
         """
 
         username = await inquirer.text( # type: ignore
@@ -357,42 +558,46 @@ class StreamNotification(object):
             style=AppConstant.CUSTOM_STYLE
         ).execute_async()
 
-        choiced_display_format = await inquirer.fuzzy( # type: ignore
+        choiced_display_format = await inquirer.select( # type: ignore
             message="Which notification method do you want to use?",
-            choices=[fmt.value for fmt in NotificationFormat.__members__.values()],
-            validate=FormatValidator(),
-            instruction="[Use arrows to move, type to filter]",
+            choices=_FORMAT_CHOICES,
+            instruction="[Use arrows to move]",
             style=AppConstant.CUSTOM_STYLE,
         ).execute_async()
         display_format = NotificationFormat(choiced_display_format)
         return username, display_format # type: ignore
 
     async def listen_for_quit(self) -> None:
-        """This method listens for the 'q' keypress and triggers the cleanup process when detected.
+        """This method listens for the 'q' keypress and requests shutdown when detected.
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         old_settings = termios.tcgetattr(sys.stdin)
         tty.setraw(sys.stdin.fileno())
         try:
             while self.is_running:
                 char = await loop.run_in_executor(None, sys.stdin.read, 1)
                 if char.lower() == "q":
-                    await self.cleanup()
+                    self._shutdown_event.set()
                     break
         finally:
             termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old_settings)
 
     async def _start_monitoring_session(self) -> None:
-        username, display_format = await self.input_monitoring_settings()
+        try:
+            username, display_format = await self.input_monitoring_settings()
+        except KeyboardInterrupt:
+            # プロンプト中のCtrl-Cはタスク外に送出させずにセッションを終える
+            return
         if username and display_format:
             if not await self.check_streamer_existence(username, display_format):
                 return
 
-            status_task = asyncio.create_task(self.check_stream_status(username, display_format))
-            self._cleanup_tasks.append(status_task)
-            quit_task = asyncio.create_task(self.listen_for_quit())
-            self._cleanup_tasks.append(quit_task)
-            await asyncio.wait([status_task, quit_task], return_when=asyncio.FIRST_COMPLETED)
+            # どちらのタスクも終了時に終了を要求し、run()のcleanupが残りのタスクをキャンセルする
+            async with asyncio.TaskGroup() as task_group:
+                status_task = task_group.create_task(self.check_stream_status(username, display_format))
+                self._cleanup_tasks.append(status_task)
+                quit_task = task_group.create_task(self.listen_for_quit())
+                self._cleanup_tasks.append(quit_task)
 
     async def run(self) -> None:
         """Main execution loop of the application
@@ -401,13 +606,15 @@ class StreamNotification(object):
         then checks for the streamer's existence.
         """
         try:
-            async with self.initialize():
-                try:
-                    await self._start_monitoring_session()
-                except (KeyboardInterrupt, asyncio.CancelledError):
-                    pass
-                finally:
-                    await self.cleanup()
+            async with self:
+                session_task = asyncio.create_task(self._start_monitoring_session())
+                shutdown_task = asyncio.create_task(self._shutdown_event.wait())
+                self._cleanup_tasks.extend((session_task, shutdown_task))
+                with contextlib.suppress(KeyboardInterrupt, asyncio.CancelledError):
+                    await asyncio.wait([session_task, shutdown_task], return_when=asyncio.FIRST_COMPLETED)
+                if session_task.done() and not session_task.cancelled():
+                    # セッション中の例外を握りつぶさず、クリーンアップの後で呼び出し元へ伝える
+                    session_task.result()
         except TwitchAPITimeoutError:
             print("\nAccess token could not be obtained due to Timeout.\nPlease launch the application again.")
             await self.cleanup()
@@ -415,4 +622,4 @@ class StreamNotification(object):
     def is_compiled(self) -> bool:
         """Check if the application is compiled
         """
-        return "__compiled__" in globals()
+        return IS_COMPILED
@@ -5,70 +5,67 @@ terminal.py
 This module provides a class for interacting with the terminal.
 """
 
-import asyncio
+import os
 import subprocess
-import traceback
 from pathlib import Path
 
+from src.osascript import compile_script, compiled_script_path, run_osascript
 from src.utils import get_logger
 
 logger = get_logger(__name__)
 
+_SCRIPT_NAMES = ("launch_terminal", "close_terminal")
+
 
 class Terminal(object):
     """Class for interacting with the terminal.
 
     Attributes:
         base_dir (Path): The base directory of the application.
+        _source_paths (dict[str, str]): The paths of the .applescript files by script name.
     """
 
     def __init__(self, base_dir: Path) -> None:
         """Initialize the terminal class."""
         self.base_dir = base_dir
+        script_dir = os.path.join(str(base_dir), "applescript")
+        self._source_paths = {name: os.path.join(script_dir, f"{name}.applescript") for name in _SCRIPT_NAMES}
+
+    def _script_path(self, name: str) -> str:
+        """Get the path of an AppleScript to run, preferring its compiled form.
+
+        Args:
+            name (str): The name of the script.
+
+        Returns:
+            str: The path of the .scpt file if it is up to date, the .applescript file otherwise.
+        """
+        source_path = self._source_paths[name]
+        return compiled_script_path(source_path) or source_path
+
+    async def compile_scripts(self) -> None:
+        """Compile the terminal AppleScripts into .scpt files for later launches."""
+        for source_path in self._source_paths.values():
+            await compile_script(source_path)
 
     async def launch_terminal(self) -> None:
         """Launch a new terminal window.
 
-        Raises:
-            FileNotFoundError: If the applescript file is not found.
-            SubprocessError: If an error occurs while executing the applescript.
+        Errors while running the applescript are logged. Closing the terminal is left to the caller.
         """
+        script_path = self._script_path("launch_terminal")
         try:
-            script_path = Path(self.base_dir, "applescript", "launch_terminal.applescript")
-        except FileNotFoundError:
-            return
-
-        try:
-            proc = await asyncio.create_subprocess_exec(
-                "/usr/bin/osascript",
-                script_path,
-                self.base_dir,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            await proc.communicate()
-        except subprocess.SubprocessError:
-            logger.exception(traceback.format_exc())
-            await self.close_terminal()
-            return
+            await run_osascript(script_path, self.base_dir)
+        except (OSError, subprocess.SubprocessError):
+            logger.exception("Failed to run %s", script_path)
 
     async def close_terminal(self) -> None:
         """Close the current terminal window.
 
-        Raises:
-            FileNotFoundError: If the applescript file is not found.
-            SubprocessError: If an error occurs while executing the applescript.
+        Errors while running the applescript are logged.
         """
+        script_path = self._script_path("close_terminal")
         try:
-            script_path = Path(self.base_dir, "applescript", "close_terminal.applescript")
-        except FileNotFoundError:
-            return
-
-        try:
-            proc = await asyncio.create_subprocess_exec(
-                "/usr/bin/osascript", script_path, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-            await proc.communicate()
-        except subprocess.SubprocessError:
-            logger.exception(traceback.format_exc())
-            return
+            await run_osascript(script_path)
+        except (OSError, subprocess.SubprocessError):
+            logger.exception("Failed to run %s", script_path)
@@ -6,11 +6,16 @@ This module provides an asynchronous client for interacting with the Twitch API.
 
 import asyncio
 import logging
-from contextlib import asynccontextmanager
-from typing import Any
+import math
+import time
+from collections import Counter, OrderedDict
+from http import HTTPStatus
+from typing import Any, Mapping
 
 import aiohttp
+import orjson
 from aiohttp import ClientSession, ClientTimeout
+from yarl import URL
 
 from src import CLIENT_ID, CLIENT_SECRET
 from src.constants import AppConstant
@@ -30,16 +35,34 @@ class TwitchAPI:
 
     Attributes:
         base_url (str): The base URL for the Twitch API.
+        users_url (URL): The URL of the Get Users endpoint.
+        streams_url (URL): The URL of the Get Streams endpoint.
         timeout (ClientTimeout): The timeout settings for the client.
         client_id (str): The client ID for the Twitch API.
         client_secret (str): The client secret for the Twitch API.
-        session (ClientSession): The client session for making requests.
+        session (ClientSession): The client session shared by all API clients.
         access_token (str): The access token for the Twitch API.
-        _token_lock (asyncio.Lock): A lock for ensuring access token is retrieved or updated safely.
+        _token_expires_at (float): The monotonic time after which the access token is refreshed.
+        _refresh_task (asyncio.Task | None): The task fetching a new access token, shared by the waiting requests.
+        _headers (dict[str, str] | None): The request headers for the current access token.
+        _etags (dict): The last ETag and data of each request, for conditional requests.
+        _inflight (dict): The requests in progress, keyed like _etags.
+        _waiters (dict[asyncio.Task, int]): The number of callers waiting for each request in progress.
+        _broadcasters (OrderedDict): The recently looked-up broadcasters by lowercased username.
+        ratelimit_limit (int | None): The size of the rate limit bucket reported by the last response.
+        ratelimit_remaining (int | None): The points left in the rate limit bucket reported by the last response.
+        ratelimit_reset (float | None): The Unix time when the rate limit bucket is refilled.
+        _session (ClientSession | None): The client session shared by all API clients.
+        _session_lock (asyncio.Lock): A lock for creating the shared client session only once.
     """
 
     base_url = "https://api.twitch.tv/helix/"
-    timeout = ClientTimeout(total=AppConstant.TIMEOUT_SECONDS)
+    users_url = URL(base_url + "users")
+    streams_url = URL(base_url + "streams")
+    # 全体の期限ではなく、接続と読み込みのそれぞれに期限を設ける
+    timeout = ClientTimeout(sock_connect=AppConstant.CONNECT_TIMEOUT_SECONDS, sock_read=AppConstant.TIMEOUT_SECONDS)
+    _session: ClientSession | None = None
+    _session_lock = asyncio.Lock()
 
     def __init__(self):
         """Initialize the API client.
@@ -47,36 +70,104 @@ class TwitchAPI:
         Attributes:
             client_id (str): The client ID for the Twitch API.
             client_secret (str): The client secret for the Twitch API.
-            session (ClientSession): The client session for making requests.
             access_token (str): The access token for the Twitch API.
-            _token_lock (asyncio.Lock): A lock for ensuring access token is retrieved or updated safely.
+            _token_expires_at (float): The monotonic time after which the access token is refreshed.
+            _refresh_task (asyncio.Task | None): The task fetching a new access token, shared by the waiting requests.
+            _headers (dict[str, str] | None): The request headers for the current access token.
+            _etags (dict): The last ETag and data of each request, for conditional requests.
+            _inflight (dict): The requests in progress, keyed like _etags.
+            _waiters (dict[asyncio.Task, int]): The number of callers waiting for each request in progress.
+            _broadcasters (OrderedDict): The recently looked-up broadcasters by lowercased username.
+            ratelimit_limit (int | None): The size of the rate limit bucket reported by the last response.
+            ratelimit_remaining (int | None): The points left in the rate limit bucket reported by the last response.
+            ratelimit_reset (float | None): The Unix time when the rate limit bucket is refilled.
         """
         self.client_id = CLIENT_ID
         self.client_secret = CLIENT_SECRET
-        self.session: ClientSession | None = None
         self.access_token: str | None = None
-        self._token_lock = asyncio.Lock()
+        self._token_expires_at = 0.0
+        self._refresh_task: asyncio.Task | None = None
+        self._headers: dict[str, str] | None = None
+        self._etags: dict[URL, tuple[str, list[dict[str, Any]] | None]] = {}
+        self._inflight: dict[URL, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+        self._broadcasters: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.ratelimit_limit: int | None = None
+        self.ratelimit_remaining: int | None = None
+        self.ratelimit_reset: float | None = None
+
+    @property
+    def session(self) -> ClientSession | None:
+        """The client session shared by all API clients, None until initialized."""
+        return TwitchAPI._session
 
     async def initialize(self) -> None:
         """Initialize the API client."""
-        if not self.session:
-            self.session = aiohttp.ClientSession(timeout=self.timeout)
-            await self._ensure_access_token()
+        async with TwitchAPI._session_lock:
+            if TwitchAPI._session is None or TwitchAPI._session.closed:
+                # 確認ごとのTLSハンドシェイクを避けるため、接続を全てのクライアントで保持して使い回す
+                connector = aiohttp.TCPConnector(
+                    limit=AppConstant.CONNECTION_LIMIT,
+                    limit_per_host=AppConstant.CONNECTION_LIMIT_PER_HOST,
+                    keepalive_timeout=AppConstant.KEEPALIVE_TIMEOUT,
+                    ttl_dns_cache=AppConstant.DNS_CACHE_TTL,
+                    enable_cleanup_closed=True,
+                )
+                TwitchAPI._session = aiohttp.ClientSession(timeout=self.timeout, connector=connector)
+        await self._ensure_access_token()
 
     async def close(self) -> None:
         """Close the API client.
+
+        The shared client session is kept open for other clients. Call shutdown() when the application exits.
         """
-        if self.session:
-            await self.session.close()
-            self.session = None
-            self.access_token = None
+        self._invalidate_access_token()
+        # セッションが閉じられた後に失敗しないよう、実行中のリクエストを止める
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._etags.clear()
+        self._broadcasters.clear()
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """Close the client session shared by all API clients.
+        """
+        async with cls._session_lock:
+            session, cls._session = cls._session, None
+            if session:
+                try:
+                    await asyncio.wait_for(session.close(), timeout=AppConstant.SESSION_CLOSE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logger.warning("Timed out closing the HTTP session.")
+
+    def _has_valid_access_token(self) -> bool:
+        """Check if the access token is available and not about to expire."""
+        return self.access_token is not None and time.monotonic() < self._token_expires_at
 
     async def _ensure_access_token(self) -> None:
         """Ensure that the access token is available.
+
+        Requests with a valid token return at once. Otherwise they all wait for one shared refresh task.
         """
-        async with self._token_lock:  # 並行処理での競合を防ぐ
-            if not self.access_token:
-                await self._get_access_token()
+        if self._has_valid_access_token():
+            return
+        # 並行して呼ばれても取得は一度だけ行い、待機中の呼び出し元がキャンセルされても取得は続行する
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._get_access_token())
+            self._refresh_task.add_done_callback(self._clear_refresh_task)
+        await asyncio.shield(self._refresh_task)
+
+    def _clear_refresh_task(self, _: asyncio.Task) -> None:
+        """Forget the finished refresh task so that the next refresh starts a new one."""
+        self._refresh_task = None
+
+    def _invalidate_access_token(self) -> None:
+        """Discard the access token so that the next request fetches a new one."""
+        self.access_token = None
+        self._headers = None
+        self._token_expires_at = 0.0
 
     async def _get_access_token(self) -> None:
         """Get the access token for the Twitch API."""
@@ -94,58 +185,98 @@ class TwitchAPI:
 
         try:
             async with self.session.post(url, params=params) as response:
-                response.raise_for_status()
-                data = await response.json()
+                if response.status >= HTTPStatus.BAD_REQUEST:
+                    raise aiohttp.ClientResponseError(
+                        response.request_info,
+                        response.history,
+                        status=response.status,
+                        message=response.reason or ""
+                    )
+                data = orjson.loads(await response.read())
                 self.access_token = data["access_token"]
+                # 有効期限の少し前に取得し直す。期限が短い場合は半分が過ぎた時点で取得し直す
+                # 期限が分からない場合は事前には取得し直さず、401の応答を受けてから取得し直す
+                expires_in = data.get("expires_in")
+                self._token_expires_at = (
+                    time.monotonic() + expires_in - min(AppConstant.TOKEN_REFRESH_MARGIN, expires_in / 2)
+                    if expires_in
+                    else math.inf
+                )
+                # トークンが変わるまでヘッダーを使い回す
+                self._headers = {
+                    "Client-ID": self.client_id,
+                    "Authorization": "Bearer " + self.access_token,
+                }
         except (asyncio.TimeoutError, asyncio.CancelledError, TimeoutError):
             raise TwitchAPITimeoutError(AppConstant.ERROR_ACCESS_TOKEN_TIMEOUT) from None
 
     def _get_headers(self) -> dict[str, str]:
         """Get the headers for the API request.
+
+        The same dict is returned until the access token changes, so it must not be modified.
         """
-        if not self.access_token:
+        if not self._headers:
             raise TwitchAPIError(
                 AppConstant.ERROR_ACCESS_TOKEN_NOT_AVAILABLE
             )
 
-        return {
-            "Client-ID": self.client_id,
-            "Authorization": f"Bearer {self.access_token}",
-        }
+        return self._headers
 
-    @asynccontextmanager
-    async def _make_request(self, url: str, query_params: dict[str, Any] | None = None):
-        """Make an API request and yield the response.
-        """
-        if not self.session:
-            raise TwitchAPIError(
-                AppConstant.ERROR_SESSION_NOT_INITIALIZED
-            )
+    async def _get_response(self, url: URL) -> list[dict[str, Any]] | None:
+        """Get the response data from the API.
 
-        await self._ensure_access_token()
+        Concurrent calls for the same URL share a single request,
+        which is cancelled when all of its callers are cancelled.
+
+        Args:
+            url (URL): The URL to make the request to, including the query
 
+        Returns:
+            list[dict[str, Any]] | None: The response data if successful, None otherwise
+
+        Raises:
+            TwitchAPIError: If the request fails
+            TwitchAPITimeoutError: If the request times out
+        """
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.create_task(self._fetch_response(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+            task.add_done_callback(self._forget_waiters)
+
+        # 同じリクエストを待つ呼び出し元の一つがキャンセルされても、共有中のリクエストは続行する
+        self._waiters[task] = self._waiters.get(task, 0) + 1
         try:
-            async with self.session.get(
-                url,
-                headers=self._get_headers(),
-                params=query_params
-            ) as response:
-                yield response
-        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-            logger.exception(AppConstant.ERROR_API_REQUEST_FAILED)
-            error_msg = f"{AppConstant.ERROR_API_REQUEST_FAILED}: {str(e)}"
-            raise TwitchAPIError(error_msg) from e
-
-    async def _get_response(
-        self,
-        url: str,
-        query_params: dict[str, Any] | None = None
-    ) -> list[dict[str, Any]] | None:
-        """Get the response data from the API.
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # 待っている呼び出し元がいなくなったリクエストは止める
+            if self._waiters.get(task) == 1:
+                task.cancel()
+            raise
+        finally:
+            if task in self._waiters:
+                self._waiters[task] -= 1
+
+    def _forget_waiters(self, task: asyncio.Task) -> None:
+        """Forget the callers of a finished request.
 
         Args:
-            url (str): The URL to make the request to
-            query_params (dict[str, Any] | None, optional): The query parameters. Defaults to None.
+            task (asyncio.Task): The finished request
+        """
+        self._waiters.pop(task, None)
+        if not task.cancelled():
+            # 呼び出し元が全員キャンセルされた場合も、例外を取り出し済みにして警告を抑える
+            task.exception()
+
+    async def _fetch_response(self, url: URL) -> list[dict[str, Any]] | None:
+        """Send a request to the API and get the response data.
+
+        The last ETag of the URL is sent as If-None-Match so that an unchanged resource is answered with 304.
+        Failed responses are retried as decided by _retry_delay.
+
+        Args:
+            url (URL): The URL to make the request to, including the query
 
         Returns:
             list[dict[str, Any]] | None: The response data if successful, None otherwise
@@ -154,32 +285,159 @@ class TwitchAPI:
             TwitchAPIError: If the request fails
             TwitchAPITimeoutError: If the request times out
         """
+        if not self.session:
+            raise TwitchAPIError(
+                AppConstant.ERROR_SESSION_NOT_INITIALIZED
+            )
+
+        cached = self._etags.get(url)
+        attempts: Counter[int] = Counter()
         try:
-            async with self._make_request(url, query_params) as response:
-                response.raise_for_status()
-                data = await response.json()
-                return data.get("data")
+            while True:
+                await self._ensure_access_token()
+                headers = self._get_headers()
+                if cached:
+                    # 変更がなければ304が返り、前回のデータを使い回せる
+                    headers = {**headers, "If-None-Match": cached[0]}
+
+                try:
+                    async with self.session.get(url, headers=headers) as response:
+                        self._update_ratelimit(response.headers)
+                        if cached and response.status == HTTPStatus.NOT_MODIFIED:
+                            return cached[1]
+                        delay = self._retry_delay(response.status, attempts)
+                        if delay is None:
+                            return await self._read_response(url, response)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    logger.exception(AppConstant.ERROR_API_REQUEST_FAILED)
+                    error_msg = f"{AppConstant.ERROR_API_REQUEST_FAILED}: {str(e)}"
+                    raise TwitchAPIError(error_msg) from e
+
+                # 接続を解放してから待機する
+                if delay:
+                    logger.warning("Twitch API returned %s. Retrying in %.1f seconds.", response.status, delay)
+                    await asyncio.sleep(delay)
         except (aiohttp.ClientError, asyncio.TimeoutError):
             raise TwitchAPIError(AppConstant.ERROR_API_TIMEOUT_FAILED) from None
         except asyncio.CancelledError:
             raise TwitchAPITimeoutError(AppConstant.ERROR_API_REQUEST_FAILED) from None
 
+    def _retry_delay(self, status: int, attempts: Counter[int]) -> float | None:
+        """Decide whether a request should be retried for the response status.
+
+        A 401 response is retried once with a new access token, a 429 response is retried once
+        after the rate limit resets, and a 5xx response is retried up to SERVER_ERROR_RETRIES times
+        with exponential backoff.
+
+        Args:
+            status (int): The status code of the response
+            attempts (Counter[int]): The number of retries made so far for each status class
+
+        Returns:
+            float | None: The number of seconds to wait before retrying, or None if the response is final
+        """
+        if status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            status = HTTPStatus.INTERNAL_SERVER_ERROR
+            limit = AppConstant.SERVER_ERROR_RETRIES
+        elif status in (HTTPStatus.UNAUTHORIZED, HTTPStatus.TOO_MANY_REQUESTS):
+            limit = 1
+        else:
+            return None
+
+        count = attempts[status]
+        if count >= limit:
+            return None
+        attempts[status] += 1
+
+        if status == HTTPStatus.UNAUTHORIZED:
+            # トークンが失効していた場合は取得し直してすぐに再試行する
+            self._invalidate_access_token()
+            return 0.0
+        if status == HTTPStatus.TOO_MANY_REQUESTS:
+            # レート制限の残量が戻るまで待ってから再試行する
+            return self._ratelimit_reset_delay()
+        return min(2 ** count, AppConstant.RETRY_MAX_BACKOFF)
+
+    async def _read_response(self, url: URL, response: aiohttp.ClientResponse) -> list[dict[str, Any]] | None:
+        """Read the data from a final response and remember its ETag.
+
+        Args:
+            url (URL): The URL the request was made to
+            response (aiohttp.ClientResponse): The response to read
+
+        Returns:
+            list[dict[str, Any]] | None: The response data
+
+        Raises:
+            aiohttp.ClientResponseError: If the response has an error status
+        """
+        if response.status >= HTTPStatus.BAD_REQUEST:
+            raise aiohttp.ClientResponseError(
+                response.request_info,
+                response.history,
+                status=response.status,
+                message=response.reason or ""
+            )
+        # 応答はバイト列のままorjsonで読み込む
+        data = orjson.loads(await response.read()).get("data")
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etags[url] = (etag, data)
+        return data
+
+    def _ratelimit_reset_delay(self) -> float:
+        """Get how long to wait for the rate limit bucket to be refilled.
+
+        Returns:
+            float: The number of seconds until the reset time, between 1 and RATELIMIT_MAX_BACKOFF
+        """
+        if self.ratelimit_reset is None:
+            return 1.0
+        return max(1.0, min(self.ratelimit_reset - time.time(), AppConstant.RATELIMIT_MAX_BACKOFF))
+
+    def _update_ratelimit(self, headers: Mapping[str, str]) -> None:
+        """Store the rate limit state reported by the response headers.
+
+        Args:
+            headers (Mapping[str, str]): The response headers
+        """
+        try:
+            if "Ratelimit-Limit" in headers:
+                self.ratelimit_limit = int(headers["Ratelimit-Limit"])
+            if "Ratelimit-Remaining" in headers:
+                self.ratelimit_remaining = int(headers["Ratelimit-Remaining"])
+            if "Ratelimit-Reset" in headers:
+                self.ratelimit_reset = float(headers["Ratelimit-Reset"])
+        except ValueError:
+            logger.warning("Invalid rate limit headers.")
+
     async def get_broadcaster(self, name: str) -> dict | None:
         """Get the broadcaster information.
 
+        Found broadcasters are cached for BROADCASTER_CACHE_TTL seconds, keeping the most recently used ones.
+
         Args:
             name (str): The username of the broadcaster
 
         Returns:
             Optional[BroadcasterData]: The broadcaster information if found, None otherwise
         """
-        url = self.base_url + "users"
-        query_params = {"login": name}
+        key = name.lower()
+        now = time.monotonic()
+        cached = self._broadcasters.get(key)
+        if cached and now - cached[0] < AppConstant.BROADCASTER_CACHE_TTL:
+            self._broadcasters.move_to_end(key)
+            return cached[1]
+
         try:
-            data = await self._get_response(url, query_params)
+            data = await self._get_response(self.users_url.with_query(login=name))
             if not data or not data[0]:
                 return None
 
+            self._broadcasters[key] = (now, data[0])
+            self._broadcasters.move_to_end(key)
+            while len(self._broadcasters) > AppConstant.BROADCASTER_CACHE_SIZE:
+                self._broadcasters.popitem(last=False)
             return data[0]
         except TwitchAPITimeoutError:
             return None
@@ -189,39 +447,63 @@ class TwitchAPI:
     async def get_stream_by_id(
         self,
         user_id: str
-    ) -> tuple[str | None, str | None]:
+    ) -> tuple[str | None, str | None, str | None]:
         """Get the stream data for a given user ID."""
-        url = self.base_url + "streams"
-        query_params = {"user_id": user_id}
-
         try:
-            stream_data = await self._get_response(url, query_params)
+            stream_data = await self._get_response(self.streams_url.with_query(user_id=user_id))
             if not stream_data:
-                return None, None
+                return None, None, None
             return self._get_stream_data(stream_data)
         except (TwitchAPIError, TwitchAPITimeoutError):
-            return None, None
+            return None, None, None
 
     async def get_stream_by_name(
         self,
         user_name: str
-    ) -> tuple[str | None, str | None]:
+    ) -> tuple[str | None, str | None, str | None]:
         """Get the stream data for a given user name.
         """
-        url = self.base_url + "streams"
-        query_params = {"user_login": user_name}
-
         try:
-            stream_data = await self._get_response(url, query_params)
+            stream_data = await self._get_response(self.streams_url.with_query(user_login=user_name))
             if not stream_data:
-                return None, None
+                return None, None, None
             return self._get_stream_data(stream_data)
         except (TwitchAPIError, TwitchAPITimeoutError):
-            return None, None
+            return None, None, None
+
+    async def get_streams_by_ids(
+        self,
+        user_ids: list[str]
+    ) -> dict[str, tuple[str | None, str | None, str | None]]:
+        """Get the stream data for many user IDs with as few requests as possible.
+
+        Up to STREAMS_PER_REQUEST users are fetched in one request, and the requests are sent concurrently.
+
+        Args:
+            user_ids (list[str]): The user IDs of the broadcasters
+
+        Returns:
+            dict[str, tuple[str | None, str | None, str | None]]:
+                The display name, the stream title and the stream ID by user ID, for the users who are streaming
+        """
+        size = AppConstant.STREAMS_PER_REQUEST
+        urls = [
+            self.streams_url.with_query([("user_id", user_id) for user_id in user_ids[i:i + size]])
+            for i in range(0, len(user_ids), size)
+        ]
+        results = await asyncio.gather(*(self._get_response(url) for url in urls), return_exceptions=True)
+
+        streams: dict[str, tuple[str | None, str | None, str | None]] = {}
+        for stream_data in results:
+            if isinstance(stream_data, BaseException) or not stream_data:
+                continue
+            for stream in stream_data:
+                streams[stream["user_id"]] = (stream.get("user_name"), stream.get("title"), stream.get("id"))
+        return streams
 
     def _get_stream_data(
         self,
         stream_data: list[dict[str, Any]]
-    ) -> tuple[str | None, str | None]:
-        """Get the stream data from the API response."""
-        return stream_data[0].get("user_name"), stream_data[0].get("title")
+    ) -> tuple[str | None, str | None, str | None]:
+        """Get the display name, the stream title and the stream ID from the API response."""
+        return stream_data[0].get("user_name"), stream_data[0].get("title"), stream_data[0].get("id")
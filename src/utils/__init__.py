@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 
-from .base_path import get_base_path
-from .logger import get_logger
+from .base_path import IS_COMPILED, get_base_path
+from .logger import configure_logging, get_logger
 from .validators import FormatValidator, UsernameValidator
 
 __all__ = [
+    "IS_COMPILED",
+    "configure_logging",
     "get_base_path",
     "get_logger",
     "FormatValidator",
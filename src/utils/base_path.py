@@ -8,6 +8,14 @@ import os
 import sys
 from pathlib import Path
 
+# コンパイルの有無と基準パスは実行中に変わらないため、インポート時に一度だけ求める
+IS_COMPILED = "__compiled__" in globals()
+BASE_PATH = (
+    Path(os.path.dirname(os.path.realpath(sys.argv[0])))
+    if IS_COMPILED
+    else Path(__file__).parent.parent.resolve()
+)
+
 
 def get_base_path() -> Path:
     """Get the base path of the application
@@ -16,6 +24,4 @@ def get_base_path() -> Path:
     Returns:
         Path: The base path of the application
     """
-    if "__compiled__" in globals():
-        return Path(os.path.dirname(os.path.realpath(sys.argv[0])))
-    return Path(__file__).parent.parent.resolve()
+    return BASE_PATH
@@ -4,26 +4,39 @@
 This module provides a logger for the application.
 """
 
+import functools
 import logging
 
 from src.constants import AppConstant
 
-logging.basicConfig(
-    level=logging.INFO,
-    format=AppConstant.LOG_FORMAT,
-    datefmt="%Y-%m-%d %H:%M:%S %Z",
-)
 
+def configure_logging() -> None:
+    """
+    Configure the root logger of the application.
+
+    Call this once from the entry point so that importing modules does not install a handler.
+    Nothing is changed if the root logger already has a handler.
+    """
+    if logging.getLogger().handlers:
+        return
+    logging.basicConfig(
+        level=logging.INFO,
+        format=AppConstant.LOG_FORMAT,
+        datefmt=AppConstant.LOG_DATE_FORMAT,
+    )
+
+@functools.cache
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance.
 
+    Pass message arguments separately, e.g. logger.debug("stream: %s", stream_id), instead of formatting
+    them in advance. The message is then only formatted when the level is enabled.
+
     Args:
         name (str): The name of the logger.
 
     Returns:
         logging.Logger: The logger instance.
-            """
-    """Get a logger instance.
     """
     return logging.getLogger(name)
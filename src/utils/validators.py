@@ -1,7 +1,5 @@
 # -*- coding: utf-8 -*-
 
-import re
-
 from prompt_toolkit.validation import ValidationError, Validator
 
 from src.enums import NotificationFormat
@@ -21,16 +19,22 @@ class UsernameValidator(Validator):
         Raises:
             ValidationError: The username is empty or contains non-alphanumeric characters
         """
-        if not document.text: # 入力が空の場合
-            raise ValidationError(message="Username cannot be empty", cursor_position=len(document.text))
-        if not re.match(r"^[a-zA-Z0-9_]+$", document.text): # 英数字とアンダースコア以外が含まれている場合
-            raise ValidationError(message="Username must be alphanumeric", cursor_position=len(document.text))
+        text = document.text
+        if not text: # 入力が空の場合
+            raise ValidationError(message="Username cannot be empty", cursor_position=document.cursor_position)
+        # 英数字とアンダースコア以外が含まれている場合
+        # isascii()で全角文字などを除外してから、アンダースコアを英字に置き換えてisalnum()で判定する
+        if not (text.isascii() and text.replace("_", "a").isalnum()):
+            raise ValidationError(message="Username must be alphanumeric", cursor_position=document.cursor_position)
 
 class FormatValidator(Validator):
     """FormatValidator
 
     FormatValidator is a prompt_toolkit Validator that validates the format input
     """
+    # 入力のたびに作り直さないよう、有効な表示形式はクラス定義時に一度だけ求める
+    _VALID_FORMATS = frozenset(fmt.value for fmt in NotificationFormat)
+
     def validate(self, document) -> None:
         """Validate the format input
 
@@ -40,9 +44,8 @@ class FormatValidator(Validator):
         Raises:
             ValidationError: The format is invalid. Not Notification or Dialog
         """
-        valid_formats = [fmt.value for fmt in NotificationFormat.__members__.values()]
-        if document.text not in valid_formats:
+        if document.text not in FormatValidator._VALID_FORMATS:
             raise ValidationError(
                 message="Invalid notification method. Valid options are: Notification, Dialog",
-                cursor_position=len(document.text)
+                cursor_position=document.cursor_position
             )